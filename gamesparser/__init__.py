@@ -5,8 +5,20 @@ logging.basicConfig(
     format="%(asctime)s %(name)s (%(filename)s:%(lineno)d) %(levelname)s - %(message)s",
 )
 
-from .models import AbstractParser, ParsedItem
+from .models import AbstractParser, ParsedItem, ParseResult
 from .psn import PsnParser
+from .storage import MemoryProductStore, ProductStore, SqliteProductStore
+from .tasks import RetryPolicy
 from .xbox import XboxParser
 
-__all__ = ["AbstractParser", "ParsedItem", "PsnParser", "XboxParser"]
+__all__ = [
+    "AbstractParser",
+    "MemoryProductStore",
+    "ParsedItem",
+    "ParseResult",
+    "ProductStore",
+    "PsnParser",
+    "RetryPolicy",
+    "SqliteProductStore",
+    "XboxParser",
+]
@@ -0,0 +1,71 @@
+from collections.abc import Iterable, Mapping, Sequence
+from functools import lru_cache, partial
+import logging
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+
+from .tasks import RetryPolicy, run_tasks
+
+
+@lru_cache(maxsize=4096)
+def normalize_url(url: str) -> str:
+    """Removes query params (width, height, etc..) and fragment from url"""
+    parts = urlsplit(url)
+    if not parts.query and not parts.fragment:
+        return url
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+
+def select_preview(media: Sequence[Mapping]) -> tuple[str, list[str]]:
+    """Picks preview in a stable manner: MASTER image if present, otherwise first image in order.
+    Returns preview url and urls of all other media"""
+    preview: str | None = None
+    fallback: str | None = None
+    other_media: list[str] = []
+    for el in media:
+        if el["role"] == "MASTER":
+            preview = el["url"]
+            continue
+        if fallback is None and el["type"] == "IMAGE":
+            fallback = el["url"]
+        other_media.append(el["url"])
+    preview = preview or fallback
+    assert preview is not None, "Product doesn't have any images"
+    return preview, other_media
+
+
+async def check_urls(
+    client: httpx.AsyncClient,
+    urls: Iterable[str],
+    max_concurrent_req: int = 10,
+    logger: logging.Logger | None = None,
+) -> dict[str, bool]:
+    """Sends HEAD request for each unique url, using pool of max_concurrent_req workers.
+    Returns mapping of url to whether it's reachable"""
+    if logger is None:
+        logger = logging.getLogger("GAMESPARSER")
+    results: dict[str, bool] = {}
+
+    async def check(url: str) -> bool:
+        try:
+            resp = await client.head(url, follow_redirects=True)
+        except (httpx.HTTPError, httpx.InvalidURL):
+            return False
+        return resp.is_success
+
+    def units():
+        seen: set[str] = set()
+        for url in urls:
+            if url not in seen:
+                seen.add(url)
+                yield url, partial(check, url)
+
+    await run_tasks(
+        units(),
+        RetryPolicy(max_retries=0),
+        logger,
+        max_workers=max_concurrent_req,
+        on_result=results.__setitem__,
+    )
+    return results
@@ -3,7 +3,10 @@ import logging
 import httpx
 from collections.abc import Iterable, Sequence
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from .media import check_urls
+from .tasks import RetryPolicy, TaskFailure, TasksReport
 
 
 @dataclass
@@ -48,16 +51,42 @@ class PsnItemDetails:
     deal_until: datetime | None = None
 
 
+@dataclass
+class ParseResult[I: ParsedItem]:
+    items: list[I]
+    skipped_count: int = 0  # items which failed to parse
+    pages_count: int = 0  # succesfully parsed pages
+    failed_pages: dict[str, TaskFailure] = field(default_factory=dict)  # url -> failure
+    retries_count: int = 0
+
+    def add_page(self, skipped_count: int):
+        self.skipped_count += skipped_count
+        self.pages_count += 1
+
+    def add_report(self, report: TasksReport):
+        """Merges failures and retries of a tasks run"""
+        self.failed_pages.update(report.failures)
+        self.retries_count += report.retries_count
+
+    @property
+    def coverage(self) -> float:
+        """Share of succesfully parsed pages (0-1)"""
+        total = self.pages_count + len(self.failed_pages)
+        return self.pages_count / total if total else 1.0
+
+
 class AbstractParser[T](ABC):
     def __init__(
         self,
         client: httpx.AsyncClient,
         logger: logging.Logger | None = None,
+        retry_policy: RetryPolicy | None = None,
     ):
         self._client = client
         if logger is None:
             logger = logging.getLogger("GAMESPARSER")
         self._logger = logger
+        self._retry_policy = retry_policy or RetryPolicy()
 
     def _normalize_regions(self, regions: Iterable[str]) -> list[str]:
         assert not isinstance(regions, str), "regions can't be string"
@@ -68,7 +97,40 @@ class AbstractParser[T](ABC):
                 normalized.append(reg)
         return normalized
 
+    def _log_result(self, result: ParseResult, items_count: int | None = None):
+        if items_count is None:
+            items_count = len(result.items)
+        if not items_count and not result.skipped_count:
+            self._logger.warning("Couldn't find any products for provided regions")
+        else:
+            self._logger.info(
+                "Parsed: %s items, skipped: %d (%.1f%%)",
+                items_count,
+                result.skipped_count,
+                result.skipped_count / (items_count + result.skipped_count) * 100,
+            )
+        if result.failed_pages:
+            self._logger.warning(
+                "Failed to load %d page(s), coverage: %.1f%%. Retries made: %d",
+                len(result.failed_pages),
+                result.coverage * 100,
+                result.retries_count,
+            )
+
+    async def check_previews(
+        self, items: Iterable[ParsedItem], max_concurrent_req: int = 10
+    ) -> dict[str, bool]:
+        """Validates preview urls of parsed items with HEAD requests. Returns mapping of preview url to its availability"""
+        return await check_urls(
+            self._client,
+            (item.preview_img_url for item in items),
+            max_concurrent_req,
+            self._logger,
+        )
+
     @abstractmethod
     async def parse(self, regions: Iterable[str]) -> Sequence[ParsedItem]: ...
     @abstractmethod
+    async def parse_detailed(self, regions: Iterable[str]) -> ParseResult: ...
+    @abstractmethod
     async def parse_item_details(self, url: str) -> T | None: ...
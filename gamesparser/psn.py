@@ -1,16 +1,26 @@
 import asyncio
 from collections.abc import Iterable, Mapping
 from datetime import datetime
+from functools import partial
 import logging
 import re
-import random
 import math
 import json
 
 from bs4 import BeautifulSoup, Tag
+from bs4.filter import SoupStrainer
 import httpx
 import pytz
-from .models import AbstractParser, Price, PsnItemDetails, PsnParsedItem
+from .media import select_preview
+from .models import (
+    AbstractParser,
+    ParseResult,
+    Price,
+    PsnItemDetails,
+    PsnParsedItem,
+)
+from .storage import MemoryProductStore, ProductStore
+from .tasks import RetryBudget, RetryPolicy, run_tasks
 
 
 class _ItemDetailsParser:
@@ -93,24 +103,8 @@ class _ItemPartialParser:
         assert s is not None
         return abs(int(s.replace("%", "")))
 
-    def _parse_preview_and_media(self) -> tuple[str, list[str]]:
-        preview: str | None = None
-        other_media: list[dict] = []
-        for el in self._data["media"]:
-            if el["role"] == "MASTER":
-                preview = el["url"]
-            else:
-                other_media.append(el)
-        if preview is None:
-            preview = str(
-                random.choice(
-                    [el["url"] for el in other_media if el["type"] == "IMAGE"]
-                )
-            )
-        return preview, [el["url"] for el in other_media]
-
     def parse(self, region: str, item_url: str) -> PsnParsedItem:
-        preview_img_url, media = self._parse_preview_and_media()
+        preview_img_url, media = select_preview(self._data["media"])
         return PsnParsedItem(
             id=self._data["id"],
             name=self._data["name"],
@@ -124,6 +118,32 @@ class _ItemPartialParser:
         )
 
 
+class _ParseSession:
+    """Holds state of a single `PsnParser.parse` call, so one parser instance can run many parses concurrently"""
+
+    def __init__(
+        self,
+        store: ProductStore[PsnParsedItem],
+        retry_budget: RetryBudget,
+        limit: int | None,
+    ):
+        self.store = store
+        self.retry_budget = retry_budget
+        self.limit = limit
+        self.result = ParseResult[PsnParsedItem]([])
+
+    def add_page(self, products: list[PsnParsedItem], skipped_count: int):
+        for product in products:
+            # once limit is reached only prices of already stored products are merged
+            if (
+                self.limit is None
+                or product.id in self.store
+                or len(self.store) < self.limit
+            ):
+                self.store.add(product)
+        self.result.add_page(skipped_count)
+
+
 class PsnParser(AbstractParser[PsnItemDetails]):
     """Parses sales from psn official website. CAUTION: there might be products which looks absolutely the same but have different discount and prices.
     That's due to the fact that on psn price depends on product platform (ps4, ps5, etc). Such products aren't handled in parser."""
@@ -135,31 +155,32 @@ class PsnParser(AbstractParser[PsnItemDetails]):
         client: httpx.AsyncClient,
         logger: logging.Logger | None = None,
         max_concurrent_req: int = 5,
+        retry_policy: RetryPolicy | None = None,
+        max_workers: int | None = None,
     ):
-        super().__init__(client, logger)
+        """max_workers - number of pages processed at once by a single parse call (defaults to max_concurrent_req).
+        Together with max_concurrent_req it bounds number of page bodies held in memory"""
+        super().__init__(client, logger, retry_policy)
+        self._max_workers = max_workers or max_concurrent_req
+        # long-lived resources shared between all parse calls
         self._sem = asyncio.Semaphore(max_concurrent_req)
-        self._items_mapping: dict[str, PsnParsedItem] = {}
-        self._curr_locale: str | None = None
-        self._skipped_count = 0
-        self._cookies = None
+        self._cookies = httpx.Cookies()
 
-    def _build_curr_url(self, page_num: int | None = None) -> str:
-        assert self._curr_locale is not None, "locale is not set"
+    def _build_curr_url(self, locale: str, page_num: int | None = None) -> str:
         url = (
-            self._url_prefix.format(region=self._curr_locale)
+            self._url_prefix.format(region=locale)
             + "/category/3f772501-f6f8-49b7-abac-874a88ca4897/"
         )
         if page_num is not None:
             url += str(page_num)
         return url
 
-    def _build_product_url(self, product_id: str) -> str:
-        assert self._curr_locale is not None, "locale is not set"
-        return (
-            self._url_prefix.format(region=self._curr_locale) + "/product/" + product_id
-        )
+    def _build_product_url(self, locale: str, product_id: str) -> str:
+        return self._url_prefix.format(region=locale) + "/product/" + product_id
 
-    async def _load_page(self, url: str, **kwargs) -> BeautifulSoup:
+    async def _load_page(
+        self, url: str, parse_only: SoupStrainer | None = None, **kwargs
+    ) -> BeautifulSoup:
         async with self._sem:
             resp = await self._client.get(
                 url,
@@ -183,11 +204,17 @@ class PsnParser(AbstractParser[PsnItemDetails]):
                 ) from e
             raise
 
-        if self._cookies:
-            self._cookies.update(resp.cookies)
-        else:
-            self._cookies = resp.cookies
-        return BeautifulSoup(resp.text, "html.parser")
+        self._cookies.update(resp.cookies)
+        return BeautifulSoup(resp.text, "html.parser", parse_only=parse_only)
+
+    async def _load_json_data(self, url: str) -> dict:
+        # build tree only for the script with json data, instead of the whole page
+        soup = await self._load_page(
+            url, parse_only=SoupStrainer("script", id="__NEXT_DATA__")
+        )
+        data = self._extract_json(soup)
+        soup.decompose()
+        return data
 
     def _extract_json(self, soup: BeautifulSoup) -> dict:
         json_data_container = soup.find("script", id="__NEXT_DATA__")
@@ -196,9 +223,8 @@ class PsnParser(AbstractParser[PsnItemDetails]):
         )
         return json.loads(json_data_container.string)["props"]["apolloState"]
 
-    async def _get_last_page_num_with_page_size(self) -> tuple[int, int]:
-        soup = await self._load_page(self._build_curr_url())
-        data = self._extract_json(soup)
+    async def _get_last_page_num_with_page_size(self, locale: str) -> tuple[int, int]:
+        data = await self._load_json_data(self._build_curr_url(locale))
         page_info = None
         for key, value in data.items():
             if key.lower().startswith("categorygrid"):
@@ -206,41 +232,68 @@ class PsnParser(AbstractParser[PsnItemDetails]):
         assert page_info, "Failed to find page_info in json data"
         return math.ceil(page_info["totalCount"] / page_info["size"]), page_info["size"]
 
-    async def _parse_single_page(self, page_num: int):
-        url = self._build_curr_url(page_num)
-        soup = await self._load_page(url)
+    async def _parse_single_page(
+        self, locale: str, page_num: int
+    ) -> tuple[list[PsnParsedItem], int]:
+        """Returns parsed products and count of skipped ones"""
+        url = self._build_curr_url(locale, page_num)
+        data = await self._load_json_data(url)
         self._logger.info("Page %d loaded", page_num)
-        data = self._extract_json(soup)
-        soup.decompose()
+        products: list[PsnParsedItem] = []
+        skipped_count = 0
         for key, value in data.items():
             if not key.lower().startswith("product:") or value["price"]["isFree"]:
                 continue
-            _, product_id, locale = key.split(":")
-            region = locale.split("-")[1]
+            _, product_id, product_locale = key.split(":")
+            region = product_locale.split("-")[1]
             try:
                 parsed_product = _ItemPartialParser(value).parse(
-                    region, self._build_product_url(product_id)
+                    region, self._build_product_url(product_locale, product_id)
                 )
             except AssertionError as e:
                 self._logger.info(
                     "Failed to parse product: %s. KEY: %s, VALUE: %s", e, key, value
                 )
-                self._skipped_count += 1
+                skipped_count += 1
                 continue
-            if product_id in self._items_mapping:
-                self._items_mapping[product_id].prices.update(parsed_product.prices)
-            else:
-                self._items_mapping[product_id] = parsed_product
+            products.append(parsed_product)
         self._logger.info("Page %d succesfully parsed", page_num)
+        return products, skipped_count
 
-    async def _parse_all_for_region(self, locale: str, limit: int | None):
-        self._curr_locale = locale
-        last_page_num, page_size = await self._get_last_page_num_with_page_size()
+    async def _parse_all_for_region(
+        self, session: _ParseSession, locale: str, limit: int | None
+    ):
+        first_page_url = self._build_curr_url(locale)
+        report = await run_tasks(
+            {first_page_url: partial(self._get_last_page_num_with_page_size, locale)},
+            self._retry_policy,
+            self._logger,
+            budget=session.retry_budget,
+        )
+        session.result.add_report(report)
+        if first_page_url in report.failures:
+            return
+        last_page_num, page_size = report.results[first_page_url]
         if limit is not None:
-            last_page_num = math.ceil(limit / page_size)
+            last_page_num = min(last_page_num, math.ceil(limit / page_size))
         self._logger.info("Parsing up to %d page", last_page_num)
-        coros = [self._parse_single_page(i) for i in range(1, last_page_num + 1)]
-        await asyncio.gather(*coros)
+        # units are created lazily by workers, so pages count doesn't affect memory usage
+        units = (
+            (
+                self._build_curr_url(locale, i),
+                partial(self._parse_single_page, locale, i),
+            )
+            for i in range(1, last_page_num + 1)
+        )
+        report = await run_tasks(
+            units,
+            self._retry_policy,
+            self._logger,
+            max_workers=self._max_workers,
+            on_result=lambda _, page: session.add_page(*page),
+            budget=session.retry_budget,
+        )
+        session.result.add_report(report)
 
     async def parse_item_details(self, url: str) -> PsnItemDetails | None:
         soup = await self._load_page(url, follow_redirects=True)
@@ -258,21 +311,38 @@ class PsnParser(AbstractParser[PsnItemDetails]):
             )
             return None
 
-    async def parse(
-        self, regions: Iterable[str], limit: int | None = None
-    ) -> list[PsnParsedItem]:
+    async def parse_detailed(
+        self,
+        regions: Iterable[str],
+        limit: int | None = None,
+        store: ProductStore[PsnParsedItem] | None = None,
+    ) -> ParseResult[PsnParsedItem]:
+        """Same as `parse`, but also returns statistics of skipped items and failed pages.
+        If store is passed (e.g. `SqliteProductStore` to keep products on disk), products are left in it
+        and result items are empty. Limit applies to products added to the store by this call.
+        Closing such store is up to the caller"""
         regions = super()._normalize_regions(regions)
         lang_mapping = {"ua": "ru"}
         locales = [f"{lang_mapping.get(region, 'en')}-{region}" for region in regions]
-        [await self._parse_all_for_region(locale, limit) for locale in locales]
-        products = list(self._items_mapping.values())
-        if not products and not self._skipped_count:
-            self._logger.warning("Couldn't find any products for provided regions")
-            return []
-        self._logger.info(
-            "Parsed: %s items, skipped: %d (%.1f%%)",
-            len(products),
-            self._skipped_count,
-            self._skipped_count / (len(products) + self._skipped_count) * 100,
+        if store is None:
+            store = MemoryProductStore()
+            keep_in_store = False
+        else:
+            keep_in_store = True
+        session = _ParseSession(
+            store, RetryBudget(self._retry_policy.retry_budget), limit
         )
-        return products[:limit]
+        [
+            await self._parse_all_for_region(session, locale, limit)
+            for locale in locales
+        ]
+        result = session.result
+        if not keep_in_store:
+            result.items = list(session.store)
+        self._log_result(result, len(session.store))
+        return result
+
+    async def parse(
+        self, regions: Iterable[str], limit: int | None = None
+    ) -> list[PsnParsedItem]:
+        return (await self.parse_detailed(regions, limit)).items
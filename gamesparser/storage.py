@@ -0,0 +1,93 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path
+import pickle
+import sqlite3
+import tempfile
+
+from .models import ParsedItem
+
+
+class ProductStore[I: ParsedItem](ABC):
+    """Accumulates parsed products, merging prices of products with the same id"""
+
+    @abstractmethod
+    def add(self, item: I): ...
+    @abstractmethod
+    def __contains__(self, item_id: str) -> bool: ...
+    @abstractmethod
+    def __len__(self) -> int: ...
+    @abstractmethod
+    def __iter__(self) -> Iterator[I]: ...
+    def close(self): ...
+
+
+class MemoryProductStore[I: ParsedItem](ProductStore[I]):
+    def __init__(self):
+        self._items: dict[str, I] = {}
+
+    def add(self, item: I):
+        if item.id in self._items:
+            self._items[item.id].prices.update(item.prices)
+        else:
+            self._items[item.id] = item
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[I]:
+        return iter(self._items.values())
+
+
+class SqliteProductStore[I: ParsedItem](ProductStore[I]):
+    """Spills products to sqlite database on disk, so they don't occupy memory during crawl.
+    Products are committed on close. If path isn't specified - temporary file is used, which is removed on close"""
+
+    def __init__(self, path: str | Path | None = None):
+        self._tmp_file = None
+        if path is None:
+            self._tmp_file = tempfile.NamedTemporaryFile(suffix=".sqlite3")
+            path = self._tmp_file.name
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS products (id TEXT PRIMARY KEY, data BLOB NOT NULL)"
+        )
+
+    def add(self, item: I):
+        row = self._conn.execute(
+            "SELECT data FROM products WHERE id = ?", (item.id,)
+        ).fetchone()
+        if row is None:
+            self._conn.execute(
+                "INSERT INTO products (id, data) VALUES (?, ?)",
+                (item.id, pickle.dumps(item)),
+            )
+            return
+        stored: I = pickle.loads(row[0])
+        stored.prices.update(item.prices)
+        self._conn.execute(
+            "UPDATE products SET data = ? WHERE id = ?",
+            (pickle.dumps(stored), item.id),
+        )
+
+    def __contains__(self, item_id: str) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM products WHERE id = ?", (item_id,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def __iter__(self) -> Iterator[I]:
+        for (data,) in self._conn.execute("SELECT data FROM products ORDER BY rowid"):
+            yield pickle.loads(data)
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+        if self._tmp_file is not None:
+            self._tmp_file.close()
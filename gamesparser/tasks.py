@@ -0,0 +1,109 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+import logging
+from typing import cast
+
+import httpx
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = 2  # retries of a single unit
+    retry_budget: int = 20  # total retries of a single parse call
+    retry_delay: float = 1.0  # seconds, doubled after each retry
+    # only these errors (or errors caused by them) are retried, others fail unit at once
+    retry_on: tuple[type[Exception], ...] = (httpx.HTTPError,)
+
+    def is_retriable(self, error: Exception) -> bool:
+        return isinstance(error, self.retry_on) or isinstance(
+            error.__cause__, self.retry_on
+        )
+
+
+@dataclass
+class RetryBudget:
+    """Retries left, may be shared by several runs to bound retries of a whole crawl"""
+
+    remaining: int
+
+
+@dataclass
+class TaskFailure:
+    error: Exception
+    attempts: int
+
+
+@dataclass
+class TasksReport[K, R]:
+    results: dict[K, R] = field(default_factory=dict)
+    failures: dict[K, TaskFailure] = field(default_factory=dict)
+    retries_count: int = 0
+
+
+async def run_tasks[K, R](
+    units: Mapping[K, Callable[[], Awaitable[R]]]
+    | Iterable[tuple[K, Callable[[], Awaitable[R]]]],
+    policy: RetryPolicy,
+    logger: logging.Logger,
+    max_workers: int | None = None,
+    on_result: Callable[[K, R], None] | None = None,
+    budget: RetryBudget | None = None,
+) -> TasksReport[K, R]:
+    """Runs units concurrently inside TaskGroup. Unlike plain gather, failed unit doesn't cancel the others:
+    it's retried while policy allows and then recorded in report, so results of succeeded units are kept.
+
+    If max_workers is set, only that many units are in progress at once and units are pulled lazily,
+    so memory usage doesn't depend on units count. If on_result is set, results are passed to it
+    as soon as they're ready instead of being collected in report.
+    If budget isn't passed, run gets its own one of policy.retry_budget size."""
+    report: TasksReport[K, R] = TasksReport()
+    run_budget = budget if budget is not None else RetryBudget(policy.retry_budget)
+    pairs: Iterable[tuple[K, Callable[[], Awaitable[R]]]]
+    if isinstance(units, Mapping):
+        pairs = cast(Mapping[K, Callable[[], Awaitable[R]]], units).items()
+    else:
+        pairs = units
+    if max_workers is None:
+        pairs = list(pairs)
+        max_workers = len(pairs)
+    units_iter = iter(pairs)
+
+    async def run_unit(key: K, factory: Callable[[], Awaitable[R]]):
+        attempts = 0
+        delay = policy.retry_delay
+        while True:
+            attempts += 1
+            try:
+                result = await factory()
+                break
+            except Exception as e:
+                if (
+                    not policy.is_retriable(e)
+                    or attempts > policy.max_retries
+                    or run_budget.remaining <= 0
+                ):
+                    logger.warning(
+                        "Task %s failed after %d attempt(s): %s", key, attempts, e
+                    )
+                    report.failures[key] = TaskFailure(e, attempts)
+                    return
+                run_budget.remaining -= 1
+                report.retries_count += 1
+                logger.info("Task %s failed: %s. Retrying in %.1fs", key, e, delay)
+            await asyncio.sleep(delay)
+            delay *= 2
+        if on_result is None:
+            report.results[key] = result
+        else:
+            on_result(key, result)
+
+    async def worker():
+        # workers share single iterator, which acts as a work queue
+        for key, factory in units_iter:
+            await run_unit(key, factory)
+
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(max_workers):
+            tg.create_task(worker())
+    return report
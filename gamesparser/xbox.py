@@ -1,13 +1,28 @@
+import asyncio
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
+from functools import partial
+import logging
 import httpx
 from pytz import timezone
 from typing import cast
 import re
 from bs4 import BeautifulSoup, Tag
-from collections.abc import Iterable
-from .models import AbstractParser, Price, XboxItemDetails, XboxParsedItem
+from collections.abc import Iterable, Sequence
+from .media import normalize_url
+from .models import (
+    AbstractParser,
+    ParseResult,
+    Price,
+    XboxItemDetails,
+    XboxParsedItem,
+)
+from .storage import MemoryProductStore
+from .tasks import RetryBudget, RetryPolicy, run_tasks
 from returns.maybe import Maybe
+from returns.primitives.exceptions import UnwrapFailedError
+
+# errors raised by malformed item markup, such items are skipped
+_ITEM_PARSE_ERRORS = (AssertionError, UnwrapFailedError, IndexError)
 
 
 class _ItemDetailsParser:
@@ -117,8 +132,11 @@ class _ItemPartialParser:
         tag_a = maybe_tag_a.unwrap()
         return tag_a
 
-    def get_item_name(self) -> str:
-        tag_link = self._parse_tag_link()
+    def get_item_name(self) -> str | None:
+        try:
+            tag_link = self._parse_tag_link()
+        except _ITEM_PARSE_ERRORS:
+            return None
         return str(tag_link.get("title"))
 
     def parse(self) -> XboxParsedItem:
@@ -143,9 +161,7 @@ class _ItemPartialParser:
         name = str(tag_link.get("title"))
         photo_tag = tag_link.find("img")
         assert isinstance(photo_tag, Tag), "Img must be a valid tag"
-        image_url = str(photo_tag.get("src"))
-        # normalize image url by removing query params specifier width, height, etc..
-        image_url = urljoin(image_url, urlparse(image_url).path)
+        image_url = normalize_url(str(photo_tag.get("src")))
         item_url = str(tag_link.get("href"))
         item_id = item_url.split("/")[5]
         deal_until = self._parse_deal_until()
@@ -164,17 +180,31 @@ class _ItemPartialParser:
 
 class XboxParser(AbstractParser[XboxItemDetails]):
     _url_prefix = "https://www.xbox-now.com/en"
+    _region_filter_param = "region[]"
 
-    def _parse_items(self, tags) -> list[XboxParsedItem]:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        logger: logging.Logger | None = None,
+        max_concurrent_req: int = 5,
+        retry_policy: RetryPolicy | None = None,
+    ):
+        super().__init__(client, logger, retry_policy)
+        self._max_concurrent_req = max_concurrent_req
+        self._sem = asyncio.Semaphore(max_concurrent_req)
+
+    def _parse_items(
+        self, tags, regions: Iterable[str]
+    ) -> tuple[list[XboxParsedItem], int]:
         skipped_count = 0
         products = []
         i = 1
         for tag in tags:
             i += 1
-            parser = _ItemPartialParser(tag, self._regions)
+            parser = _ItemPartialParser(tag, regions)
             try:
                 parsed_item = parser.parse()
-            except AssertionError as e:
+            except _ITEM_PARSE_ERRORS as e:
                 name = parser.get_item_name()
                 self._logger.info(
                     "error during parsing product: %s. i: %s, name: %s", e, i, name
@@ -182,20 +212,12 @@ class XboxParser(AbstractParser[XboxItemDetails]):
                 skipped_count += 1
                 continue
             products.append(parsed_item)
-        if not products and not skipped_count:
-            self._logger.warning("Couldn't find any products for provided regions")
-            return []
-        self._logger.info(
-            "Parsed: %s items, skipped: %d (%.1f%%)",
-            len(products),
-            skipped_count,
-            skipped_count / (len(products) + skipped_count) * 100,
-        )
-        return products
+        return products, skipped_count
 
     async def _load_page(self, path: str, **kwargs) -> BeautifulSoup:
         url = self._url_prefix + path if path.startswith("/") else path
-        resp = await self._client.get(url, **kwargs)
+        async with self._sem:
+            resp = await self._client.get(url, **kwargs)
         resp.raise_for_status()
         soup = BeautifulSoup(resp.text, "html.parser")
         return soup
@@ -237,19 +259,124 @@ class XboxParser(AbstractParser[XboxItemDetails]):
             )
             return None
 
-    async def parse(
-        self, regions: Iterable[str], limit: int | None = None
-    ) -> list[XboxParsedItem]:
-        self._regions = super()._normalize_regions(regions)
-        soup = await self._load_page("/deal-list")
-        maybe_products: Maybe[list[XboxParsedItem]] = (
+    def _build_deal_list_url(self, regions: Sequence[str], page_num: int) -> str:
+        # let xbox-now filter out unwanted regions, so their prices aren't downloaded and parsed
+        params: list[tuple[str, str | int]] = [
+            (self._region_filter_param, region) for region in regions
+        ]
+        params.append(("page", page_num))
+        return str(httpx.URL(self._url_prefix + "/deal-list", params=params))
+
+    def _get_last_page_num(self, soup: BeautifulSoup) -> int:
+        pagination = soup.find("ul", class_="pagination")
+        if not isinstance(pagination, Tag):
+            return 1
+        page_nums = [
+            int(link.string)
+            for link in pagination.find_all("a")
+            if isinstance(link, Tag) and link.string and link.string.strip().isdigit()
+        ]
+        return max(page_nums, default=1)
+
+    def _extract_item_tags(self, soup: BeautifulSoup, limit: int | None) -> list[Tag]:
+        maybe_tags: Maybe[list[Tag]] = (
             Maybe.from_optional(soup.find("div", class_="content-wrapper"))
             .bind_optional(lambda el: cast(Tag, el).find("section", class_="content"))
             .bind_optional(
-                lambda content: cast(Tag, content).find_all(
-                    "div", class_="box-body comparison-table-entry", limit=limit
+                lambda content: cast(
+                    list[Tag],
+                    cast(Tag, content).find_all(
+                        "div", class_="box-body comparison-table-entry", limit=limit
+                    ),
                 )
             )
-            .bind_optional(lambda products: self._parse_items(products))
         )
-        return maybe_products.unwrap()
+        return maybe_tags.unwrap()
+
+    async def _parse_page(
+        self, regions: Sequence[str], page_num: int, limit: int | None
+    ) -> tuple[list[XboxParsedItem], int, int]:
+        """Returns parsed products, skipped count and number of the last available page"""
+        soup = await self._load_page(self._build_deal_list_url(regions, page_num))
+        self._logger.info("Page %d loaded", page_num)
+        products, skipped_count = self._parse_items(
+            self._extract_item_tags(soup, limit), regions
+        )
+        last_page_num = self._get_last_page_num(soup)
+        soup.decompose()
+        return products, skipped_count, last_page_num
+
+    async def parse_detailed(
+        self, regions: Iterable[str], limit: int | None = None
+    ) -> ParseResult[XboxParsedItem]:
+        """Same as `parse`, but also returns statistics of skipped items and failed pages"""
+        regions = super()._normalize_regions(regions)
+        result = ParseResult[XboxParsedItem]([])
+        # deal list may shift while crawling, so the same item can appear on several pages
+        store = MemoryProductStore[XboxParsedItem]()
+        retry_budget = RetryBudget(self._retry_policy.retry_budget)
+        first_page_url = self._build_deal_list_url(regions, 1)
+        report = await run_tasks(
+            {first_page_url: partial(self._parse_page, regions, 1, limit)},
+            self._retry_policy,
+            self._logger,
+            budget=retry_budget,
+        )
+        result.add_report(report)
+        if first_page_url in report.failures:
+            self._log_result(result)
+            return result
+        products, skipped_count, last_page_num = report.results[first_page_url]
+        for product in products:
+            store.add(product)
+        result.add_page(skipped_count)
+        page_size = len(products) + skipped_count
+        next_page_num = 2
+        pages_in_progress = 0
+
+        def add_page(_: str, page: tuple[list[XboxParsedItem], int, int]):
+            nonlocal last_page_num, pages_in_progress
+            page_products, page_skipped_count, page_last_num = page
+            pages_in_progress -= 1
+            # paginator may show only a window of pages, so the range can grow
+            last_page_num = max(last_page_num, page_last_num)
+            for product in page_products:
+                store.add(product)
+            result.add_page(page_skipped_count)
+
+        def pages():
+            nonlocal next_page_num, pages_in_progress
+            # fetch only as many pages as needed to reach the limit
+            while next_page_num <= last_page_num and (
+                limit is None or len(store) + pages_in_progress * page_size < limit
+            ):
+                pages_in_progress += 1
+                yield (
+                    self._build_deal_list_url(regions, next_page_num),
+                    partial(self._parse_page, regions, next_page_num, None),
+                )
+                next_page_num += 1
+
+        # after workers are done range may have grown or pages may have yielded
+        # less items than expected, so continue from where the previous run stopped
+        while next_page_num <= last_page_num and (
+            limit is None or len(store) < limit
+        ):
+            pages_in_progress = 0
+            report = await run_tasks(
+                pages(),
+                self._retry_policy,
+                self._logger,
+                max_workers=self._max_concurrent_req,
+                on_result=add_page,
+                budget=retry_budget,
+            )
+            result.add_report(report)
+        result.items = list(store)[:limit]
+        self._log_result(result)
+        return result
+
+    async def parse(
+        self, regions: Iterable[str], limit: int | None = None
+    ) -> list[XboxParsedItem]:
+        return (await self.parse_detailed(regions, limit)).items
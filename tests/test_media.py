@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+import pytest
+
+from gamesparser.media import check_urls, normalize_url, select_preview
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (
+            "https://store-images.s-microsoft.com/image/apps.1.png?w=100&h=100",
+            "https://store-images.s-microsoft.com/image/apps.1.png",
+        ),
+        ("https://example.com/img.png#frag", "https://example.com/img.png"),
+        ("https://example.com/img.png", "https://example.com/img.png"),
+    ],
+)
+def test_normalize_url(url: str, expected: str):
+    assert normalize_url(url) == expected
+
+
+def test_select_preview():
+    media = [
+        {"role": "SCREENSHOT", "type": "IMAGE", "url": "screenshot1"},
+        {"role": "PREVIEW", "type": "VIDEO", "url": "video"},
+        {"role": "SCREENSHOT", "type": "IMAGE", "url": "screenshot2"},
+    ]
+    # preview must be stable between runs if there is no MASTER image
+    assert select_preview(media) == (
+        "screenshot1",
+        ["screenshot1", "video", "screenshot2"],
+    )
+    media.append({"role": "MASTER", "type": "IMAGE", "url": "master"})
+    assert select_preview(media) == (
+        "master",
+        ["screenshot1", "video", "screenshot2"],
+    )
+    with pytest.raises(AssertionError):
+        select_preview([{"role": "PREVIEW", "type": "VIDEO", "url": "video"}])
+
+
+@pytest.mark.asyncio
+async def test_check_urls():
+    requested: list[str] = []
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        requested.append(str(request.url))
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if request.url.host == "down.example.com":
+            raise httpx.ConnectError("unreachable", request=request)
+        if request.url.path == "/missing.png":
+            return httpx.Response(404)
+        return httpx.Response(200)
+
+    ok_urls = [f"https://example.com/{i}.png" for i in range(6)]
+    urls = ok_urls + [
+        ok_urls[0],
+        "https://example.com/missing.png",
+        "https://down.example.com/img.png",
+        "https://example.com/\x00.png",
+    ]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        results = await check_urls(client, urls, max_concurrent_req=2)
+    assert sorted(requested) == sorted(set(urls[:-1]))
+    assert max_in_flight <= 2
+    assert results == {
+        **{url: True for url in ok_urls},
+        "https://example.com/missing.png": False,
+        "https://down.example.com/img.png": False,
+        "https://example.com/\x00.png": False,
+    }
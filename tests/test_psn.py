@@ -1,8 +1,12 @@
 import httpx
 import asyncio
+import json
 import pytest
 
+from gamesparser.models import PsnParsedItem
 from gamesparser.psn import PsnParser
+from gamesparser.storage import MemoryProductStore
+from gamesparser.tasks import RetryPolicy
 from tests.conftest import PARSE_LIMIT, check_parsed_unique_with_regions
 
 
@@ -32,3 +36,84 @@ async def test_psn_with_details(httpx_client: httpx.AsyncClient):
         except Exception:
             print("Parsing failed on", i)
             raise
+
+
+@pytest.mark.asyncio
+async def test_psn_reusable(httpx_client: httpx.AsyncClient):
+    parser = PsnParser(httpx_client)
+    ua_products, tr_products = await asyncio.gather(
+        parser.parse(("ua",), PARSE_LIMIT), parser.parse(("tr",), PARSE_LIMIT)
+    )
+    await check_parsed_unique_with_regions(("ua",), ua_products)
+    await check_parsed_unique_with_regions(("tr",), tr_products)
+    # subsequent call shouldn't return items left from previous ones
+    products = await parser.parse(("ua",), PARSE_LIMIT)
+    await check_parsed_unique_with_regions(("ua",), products)
+
+
+def _category_page_html(
+    locale: str, page_num: int, page_size: int = 2, id_prefix: str = "P"
+) -> str:
+    data: dict = {"CategoryGrid:1": {"pageInfo": {"totalCount": 10, "size": page_size}}}
+    for i in range((page_num - 1) * page_size, page_num * page_size):
+        data[f"Product:{id_prefix}{i}:{locale}"] = {
+            "id": f"{id_prefix}{i}",
+            "name": f"Game {i}",
+            "platforms": ["PS5"],
+            "media": [{"role": "MASTER", "type": "IMAGE", "url": f"img{i}"}],
+            "price": {
+                "isFree": False,
+                "discountedPrice": "100,00 TL",
+                "discountText": "-50%",
+                "isTiedToSubscription": False,
+            },
+        }
+    next_data = json.dumps({"props": {"apolloState": data}})
+    return f'<script id="__NEXT_DATA__">{next_data}</script>'
+
+
+def _category_page_num(url: httpx.URL) -> int:
+    last_part = url.path.rstrip("/").split("/")[-1]
+    return int(last_part) if last_part.isdigit() else 1
+
+
+@pytest.mark.asyncio
+async def test_psn_retry_budget_spans_regions():
+    def handler(request: httpx.Request) -> httpx.Response:
+        page_num = _category_page_num(request.url)
+        if page_num > 1:
+            return httpx.Response(503)
+        locale = request.url.path.split("/")[1]
+        return httpx.Response(200, text=_category_page_html(locale, page_num))
+
+    policy = RetryPolicy(retry_budget=3, retry_delay=0)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await PsnParser(client, retry_policy=policy).parse_detailed(
+            ("ua", "tr")
+        )
+    assert result.retries_count == 3
+    # pages 2-5 of both regions
+    assert len(result.failed_pages) == 8
+    assert result.pages_count == 2
+
+
+@pytest.mark.parametrize("shared_ids", [True, False])
+@pytest.mark.asyncio
+async def test_psn_limit_applies_to_store(shared_ids: bool):
+    def handler(request: httpx.Request) -> httpx.Response:
+        locale = request.url.path.split("/")[1]
+        id_prefix = "P" if shared_ids else locale
+        return httpx.Response(
+            200,
+            text=_category_page_html(
+                locale, _category_page_num(request.url), id_prefix=id_prefix
+            ),
+        )
+
+    store = MemoryProductStore[PsnParsedItem]()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await PsnParser(client).parse_detailed(("ua", "tr"), 3, store)
+    assert not result.items
+    assert len(store) == 3
+    if shared_ids:
+        assert all(set(item.prices) == {"ua", "tr"} for item in store)
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pytest
+
+from gamesparser.models import Price, PsnParsedItem
+from gamesparser.storage import (
+    MemoryProductStore,
+    ProductStore,
+    SqliteProductStore,
+)
+
+
+def _make_item(id: str, region: str, value: float) -> PsnParsedItem:
+    return PsnParsedItem(
+        id=id,
+        name="name" + id,
+        url="url" + id,
+        preview_img_url="img" + id,
+        discount=50,
+        prices={region: Price(currency_code="USD", discounted_value=value)},
+        platforms=["PS5"],
+        with_sub=False,
+        media=[],
+    )
+
+
+@pytest.mark.parametrize("store_cls", [MemoryProductStore, SqliteProductStore])
+def test_store_merges_prices(store_cls: type[ProductStore]):
+    store = store_cls()
+    store.add(_make_item("1", "us", 10))
+    store.add(_make_item("2", "us", 20))
+    store.add(_make_item("1", "tr", 5))
+    assert "1" in store and "3" not in store
+    items = list(store)
+    store.close()
+    assert len(items) == 2
+    assert [item.id for item in items] == ["1", "2"]
+    assert set(items[0].prices) == {"us", "tr"}
+
+
+def test_sqlite_store_persists_on_close(tmp_path: Path):
+    path = tmp_path / "products.sqlite3"
+    store = SqliteProductStore[PsnParsedItem](path)
+    store.add(_make_item("1", "us", 10))
+    store.add(_make_item("2", "us", 20))
+    store.close()
+    reopened = SqliteProductStore[PsnParsedItem](path)
+    items = list(reopened)
+    reopened.close()
+    assert [item.id for item in items] == ["1", "2"]
@@ -0,0 +1,119 @@
+import asyncio
+from functools import partial
+import logging
+
+import httpx
+import pytest
+
+from gamesparser.tasks import RetryBudget, RetryPolicy, run_tasks
+
+
+@pytest.mark.asyncio
+async def test_run_tasks_keeps_partial_results():
+    calls: dict[int, int] = {}
+
+    async def unit(i: int) -> int:
+        calls[i] = calls.get(i, 0) + 1
+        if i == 2 and calls[i] == 1:
+            raise httpx.ConnectError("flaky")
+        if i == 3:
+            raise httpx.ConnectError("broken")
+        return i * 10
+
+    policy = RetryPolicy(max_retries=2, retry_budget=10, retry_delay=0)
+    report = await run_tasks(
+        {i: lambda i=i: unit(i) for i in range(1, 5)},
+        policy,
+        logging.getLogger(__name__),
+    )
+    assert report.results == {1: 10, 2: 20, 4: 40}
+    assert list(report.failures) == [3]
+    assert report.failures[3].attempts == 3
+    assert report.retries_count == 3
+
+
+@pytest.mark.asyncio
+async def test_run_tasks_retry_budget():
+    async def unit():
+        raise httpx.ReadTimeout("broken")
+
+    policy = RetryPolicy(max_retries=5, retry_budget=2, retry_delay=0)
+    report = await run_tasks(
+        {i: unit for i in range(3)}, policy, logging.getLogger(__name__)
+    )
+    assert not report.results
+    assert len(report.failures) == 3
+    assert report.retries_count == 2
+
+
+@pytest.mark.asyncio
+async def test_run_tasks_doesnt_retry_parse_errors():
+    calls = 0
+
+    async def unit():
+        nonlocal calls
+        calls += 1
+        raise AssertionError("json data not found")
+
+    policy = RetryPolicy(max_retries=2, retry_budget=10, retry_delay=0)
+    report = await run_tasks({1: unit}, policy, logging.getLogger(__name__))
+    assert calls == 1
+    assert report.failures[1].attempts == 1
+    assert report.retries_count == 0
+
+
+@pytest.mark.asyncio
+async def test_run_tasks_bounded_workers():
+    in_flight = 0
+    max_in_flight = 0
+    created = 0
+    received: dict[int, int] = {}
+
+    async def unit(i: int) -> int:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return i * 10
+
+    def units():
+        nonlocal created
+        for i in range(20):
+            created += 1
+            # units must be pulled lazily, not created all at once
+            assert created - len(received) <= 3
+            yield i, partial(unit, i)
+
+    policy = RetryPolicy(retry_delay=0)
+    report = await run_tasks(
+        units(),
+        policy,
+        logging.getLogger(__name__),
+        max_workers=3,
+        on_result=lambda key, result: received.__setitem__(key, result),
+    )
+    assert max_in_flight <= 3
+    assert received == {i: i * 10 for i in range(20)}
+    assert not report.results
+    assert not report.failures
+
+
+@pytest.mark.asyncio
+async def test_run_tasks_shared_budget():
+    async def unit():
+        raise httpx.ConnectError("broken")
+
+    policy = RetryPolicy(max_retries=5, retry_budget=3, retry_delay=0)
+    budget = RetryBudget(policy.retry_budget)
+    reports = [
+        await run_tasks(
+            {i: unit for i in range(2)},
+            policy,
+            logging.getLogger(__name__),
+            budget=budget,
+        )
+        for _ in range(3)
+    ]
+    assert sum(report.retries_count for report in reports) == 3
+    assert budget.remaining == 0
@@ -1,8 +1,10 @@
 import asyncio
+from collections.abc import Iterable
 from urllib.parse import urlparse
 import httpx
 import pytest
 
+from gamesparser.tasks import RetryPolicy
 from gamesparser.xbox import XboxParser
 from tests.conftest import PARSE_LIMIT, check_parsed_unique_with_regions
 
@@ -28,3 +30,155 @@ async def test_xbox_with_details(httpx_client: httpx.AsyncClient):
     details = await asyncio.gather(*coros)
     # check that details of at least half of products were succesfully parsed
     assert len([obj for obj in details if obj is not None]) > len(products) * 0.5
+
+
+@pytest.mark.asyncio
+async def test_xbox_reusable(httpx_client: httpx.AsyncClient):
+    parser = XboxParser(httpx_client)
+    us_products, eg_products = await asyncio.gather(
+        parser.parse(("us",), PARSE_LIMIT), parser.parse(("eg",), PARSE_LIMIT)
+    )
+    await check_parsed_unique_with_regions(("us",), us_products)
+    await check_parsed_unique_with_regions(("eg",), eg_products)
+
+
+@pytest.mark.parametrize("limit", [1, 150])
+@pytest.mark.asyncio
+async def test_xbox_paginated_limit(httpx_client: httpx.AsyncClient, limit: int):
+    parser = XboxParser(httpx_client)
+    products = await parser.parse(("us",), limit)
+    assert 0 < len(products) <= limit
+    assert len(set(product.id for product in products)) == len(products)
+    await check_parsed_unique_with_regions(("us",), products)
+
+
+def _deal_entry_html(item_id: int) -> str:
+    return (
+        '<div class="box-body comparison-table-entry">'
+        '<div class="row"><div class="pull-left">'
+        f'<a title="Game {item_id}" href="https://www.xbox-now.com/en/game/{item_id}/game">'
+        '<img src="https://images.example.com/game.png?w=100"></a></div>'
+        "<div>info</div></div>"
+        '<div class="row">'
+        '<div class="col-xs-4 col-sm-3"><span>50%</span></div>'
+        '<div class="col-xs-4 col-sm-3"><img class="flag" title="US">'
+        '<span style="white-space: nowrap">9.99 USD</span></div>'
+        "</div></div>"
+    )
+
+
+def _deal_list_html(entries: list[str], page_nums: Iterable[int] = ()) -> str:
+    links = "".join(f"<li><a>{i}</a></li>" for i in page_nums)
+    return (
+        '<div class="content-wrapper"><section class="content">'
+        + "".join(entries)
+        + "</section></div>"
+        + f'<ul class="pagination">{links}<li><a>»</a></li></ul>'
+    )
+
+
+@pytest.mark.asyncio
+async def test_xbox_skips_malformed_items():
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        malformed_entry = '<div class="box-body comparison-table-entry"></div>'
+        entries = [_deal_entry_html(i) for i in range(3)]
+        entries.insert(1, malformed_entry)
+        return httpx.Response(200, text=_deal_list_html(entries))
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await XboxParser(client).parse_detailed(("us",))
+    assert calls == 1
+    assert not result.failed_pages
+    assert [item.id for item in result.items] == ["0", "1", "2"]
+    assert result.skipped_count == 1
+
+
+@pytest.mark.asyncio
+async def test_xbox_deal_list_requests():
+    requested: list[httpx.URL] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url)
+        page = int(request.url.params["page"])
+        return httpx.Response(
+            200, text=_deal_list_html([_deal_entry_html(page)], range(1, 4))
+        )
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        products = await XboxParser(client).parse((" US", "tr", "us"))
+    assert {url.path for url in requested} == {"/en/deal-list"}
+    assert all(url.params.get_list("region[]") == ["us", "tr"] for url in requested)
+    assert sorted(int(url.params["page"]) for url in requested) == [1, 2, 3]
+    assert sorted(product.id for product in products) == ["1", "2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_xbox_stops_at_limit():
+    requested_pages: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        requested_pages.append(page)
+        entries = [_deal_entry_html(page * 10 + i) for i in range(3)]
+        return httpx.Response(200, text=_deal_list_html(entries, range(1, 11)))
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        products = await XboxParser(client).parse(("us",), 5)
+    # first page gives 3 items, so a single extra page is enough
+    assert sorted(requested_pages) == [1, 2]
+    assert len(products) == 5
+
+
+@pytest.mark.asyncio
+async def test_xbox_windowed_pagination():
+    last_page = 8
+    requested_pages: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        requested_pages.append(page)
+        # only pages near the current one are linked
+        window = range(max(1, page - 2), min(last_page, page + 2) + 1)
+        entries = [_deal_entry_html(page * 10 + i) for i in range(2)]
+        return httpx.Response(200, text=_deal_list_html(entries, window))
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await XboxParser(client, max_concurrent_req=2).parse_detailed(("us",))
+    assert sorted(requested_pages) == list(range(1, last_page + 1))
+    assert result.pages_count == last_page
+    assert len(result.items) == last_page * 2
+
+
+@pytest.mark.asyncio
+async def test_xbox_merges_items_shifted_between_pages():
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        # item 1 moved from the first page to the second one while crawling
+        ids = [0, 1] if page == 1 else [1, 2]
+        entries = [_deal_entry_html(i) for i in ids]
+        return httpx.Response(200, text=_deal_list_html(entries, range(1, 3)))
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        products = await XboxParser(client).parse(("us",))
+    assert sorted(product.id for product in products) == ["0", "1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_xbox_retry_budget_spans_whole_crawl():
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        if page > 1:
+            return httpx.Response(503)
+        entries = [_deal_entry_html(1)]
+        return httpx.Response(200, text=_deal_list_html(entries, range(1, 31)))
+
+    policy = RetryPolicy(retry_budget=3, retry_delay=0)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await XboxParser(client, retry_policy=policy).parse_detailed(("us",))
+    assert result.retries_count == 3
+    assert len(result.failed_pages) == 29
+    assert result.pages_count == 1